@@ -3,11 +3,8 @@
 import argparse
 import sys
 import json
-import time
-import cairo
-from cairo import OPERATOR_CLEAR
-import librosa
-import numpy as np
+import wavcore
+from wavcore import print_timer, wavmap
 
 BARS = 40
 HEIGHT = 100
@@ -18,15 +15,6 @@ COLOR = (0,0,0)
 JSONINTERVAL = 10
 JSONMAX = 255
 
-# Timer helper function
-time_start = time.perf_counter()
-time_last = 0
-def print_timer():
-    global time_start, time_last
-    now = time.perf_counter()
-    print("[%05.2f][%05.2f]" % (now-time_start, now-time_last), end=" ")
-    time_last = now
-
 
 def main():
     print_timer()
@@ -62,7 +50,9 @@ def main():
     parser.add_argument("-n", "--invert", default=False, action=argparse.BooleanOptionalAction, help = "invert black and transparent in output")
     parser.add_argument("-m", "--mirror", default=False, action=argparse.BooleanOptionalAction, help = "mirror bars vertically from the center")
     parser.add_argument("-M", "--max", required=False, help = "max percent of height vs total image height (default: 0.9)")
+    wavcore.metrics.add_arguments(parser)
     args = parser.parse_args()
+    wavcore.metrics.start(args)
 
     file = args.input
     outfile = args.output
@@ -97,70 +87,32 @@ def main():
 
     print_timer()
     print("Loading audio file...")
-    # Open the audio file as mono to keep it simple
-    y, sr = librosa.load(file, sr=None, mono=True)
+    from wavcore.bars import rms_json, rms_bars, draw_bars
+    # Map plain WAVs and read them a section at a time, anything else is
+    # loaded as mono to keep it simple
+    y = wavmap.open_map(file)
+    if y is not None:
+        sr = y.samplerate
+    else:
+        y, sr = wavcore.load(file, sr=None, mono=True)
     print_timer()
     if jsonout:
-        jsondata = {}
-        jsondata['interval'] = JSONINTERVAL
-        jsondata['data'] = []
         print("Doing math for JSON waveform...")
-        samples = np.array_split(y, len(y)/sr*1000/JSONINTERVAL)
-        for sample in samples:
-            jsondata['data'].append(np.sqrt(np.mean(sample**2)))
-        # Normalize these values
-        scale = max(jsondata['data'])
-        jsondata['data'] = [ (int(x / scale * JSONMAX)) for x in jsondata['data'] ]
+        jsondata = rms_json(y, sr, JSONINTERVAL, JSONMAX)
         print("Writing JSON waveform output...")
         with open(jsonout, 'w') as f:
             json.dump(jsondata, f)
     print("Doing math...")
-    # Split into chunks and compute a value for each segment
-    segments = np.array_split(y, BARS)
-    vals = []
-    for s in segments:
-        vals.append(np.sqrt(np.mean(s**2)))
-    # Normalize these values
-    factor = max(vals) if factor == 0 else factor
-    vals = [ (x / factor) * MAX for x in vals ]
+    vals, factor = rms_bars(y, BARS, factor, MAX)
 
     if args.ffile is not None:
         with open(args.ffile, 'w') as f:
             json.dump({'factor': float(factor)}, f)
 
-    # Normalized step size per bar
-    step = (WIDTH/HEIGHT) / BARS
-    # The scaling factor on BARS controls the whitespace gaps
-    line_width = (WIDTH/HEIGHT) / (BARS * 1.25)
-
     print_timer()
     print("Drawing...")
-    with cairo.SVGSurface(outfile, WIDTH, HEIGHT) as surface:
-        context = cairo.Context(surface)
-        context.scale(HEIGHT, HEIGHT)
-        context.set_source_rgb(COLOR[0], COLOR[1], COLOR[2])
-        if args.invert:
-            context.set_source_rgba(COLOR[0], COLOR[1], COLOR[2], 1)
-            context.rectangle(0, 0, HEIGHT, WIDTH)
-            context.fill()
-            context.set_operator(OPERATOR_CLEAR)
-        context.set_line_width(line_width)
-        context.set_line_cap(cairo.LINE_CAP_ROUND)
-        count = 0
-        while count < BARS:
-            offset = (step / 2) + (count * step)
-            if args.mirror:
-                bottom = 1-(1-vals[count])/2
-                top = (1-vals[count])/2
-            else:
-                bottom = 1
-                top = 1-vals[count]
-            context.move_to(offset, bottom)
-            context.line_to(offset, top)
-            context.stroke()
-            count += STEP
-        if pngfile is not None:
-            surface.write_to_png(pngfile)
+    draw_bars(outfile, vals, BARS, STEP, WIDTH, HEIGHT, COLOR,
+              args.invert, args.mirror, pngfile)
     print_timer()
     print("Finished")
 
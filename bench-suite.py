@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import math
+import time
+import wave
+import array
+import random
+import shutil
+import zipfile
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = '/tmp/wav-bench-fixtures'
+LENGTHS = [ 5, 30 ]
+RATES = [ 22050, 44100 ]
+CHANNELS = [ 1, 2 ]
+RUNS = 3
+THRESHOLD = 10
+SEED = 1234
+# Bump whenever a change to the fixture code changes its output, so cached
+# fixtures from an older generator aren't benchmarked against a new baseline
+GENERATOR = 1
+
+# Stand-ins for ffprobe/ffmpeg so the suite runs on a box without them. The
+# probe reports what the wave module can read, the "silence remover" copies.
+FFPROBE_STUB = """#!{python}
+import os, sys, json, wave
+path = sys.argv[-1]
+info = {{ 'format': {{ 'filename': path, 'size': str(os.path.getsize(path)) }},
+          'streams': [] }}
+try:
+    with wave.open(path) as w:
+        info['format']['duration'] = str(w.getnframes() / w.getframerate())
+        info['streams'].append({{ 'codec_type': 'audio',
+                                 'sample_rate': str(w.getframerate()),
+                                 'channels': w.getnchannels() }})
+except (wave.Error, EOFError):
+    pass
+print(json.dumps(info))
+"""
+
+FFMPEG_STUB = """#!{python}
+import sys, shutil
+args = [ a for a in sys.argv[1:] if a != '-y' ]
+shutil.copyfile(args[args.index('-i') + 1], args[-1])
+"""
+
+def _publish(path, write):
+    # Write to a temporary name and rename into place, so an interrupted or
+    # concurrent run never leaves a partial fixture behind under its real name
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+def _write_wav(path, rate, channels, samples):
+    data = array.array('h', samples)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(data.tobytes())
+
+def _synth(kind, length, rate, channels, rng):
+    # One second of signal, then a quarter second of silence, repeated
+    samples = []
+    freq = 220.0
+    for n in range(int(length * rate)):
+        if n % int(1.25 * rate) >= rate:
+            value = 0.0
+        elif kind == 'tone':
+            value = 0.5 * math.sin(2 * math.pi * freq * n / rate)
+        else:
+            value = rng.uniform(-0.5, 0.5)
+        samples.extend([ int(value * 32767) ] * channels)
+    return samples
+
+def _lyrics(length, words, rng):
+    # Whisper-style segments with a word every half second, some bleepable
+    segments = []
+    t = 0.0
+    while t + 0.5 < length:
+        seg = { 'start': t, 'end': min(t + 5, length), 'words': [] }
+        while t + 0.5 < seg['end']:
+            word = rng.choice(words) if rng.random() < 0.2 else 'la'
+            seg['words'].append({ 'text': word, 'word': word, 'start': t, 'end': t + 0.4 })
+            t += 0.5
+        segments.append(seg)
+        t = seg['end']
+    return { 'segments': segments }
+
+def make_fixtures(fixture_dir, lengths, rates, channels):
+    # Deterministic: the same file name under the same GENERATOR always
+    # holds the same bytes, so anything already on disk can be reused
+    fixture_dir = os.path.join(fixture_dir, f"v{GENERATOR}")
+    os.makedirs(fixture_dir, exist_ok=True)
+    with open(os.path.join(HERE, 'wordlist.json'), 'r') as f:
+        words = json.load(f)
+    fixtures = []
+    for length in lengths:
+        for rate in rates:
+            for ch in channels:
+                name = f"{length}s-{rate}-{ch}ch"
+                entry = { 'name': name, 'length': length, 'rate': rate, 'channels': ch }
+                for kind in [ 'tone', 'noise' ]:
+                    path = os.path.join(fixture_dir, f"{name}-{kind}.wav")
+                    if not os.path.exists(path):
+                        rng = random.Random(f"{SEED}-{name}-{kind}")
+                        samples = _synth(kind, length, rate, ch, rng)
+                        _publish(path, lambda tmp: _write_wav(tmp, rate, ch, samples))
+                    entry[kind] = path
+                fixtures.append(entry)
+        lyrics = os.path.join(fixture_dir, f"{length}s-lyrics.json")
+        if not os.path.exists(lyrics):
+            data = _lyrics(length, words, random.Random(f"{SEED}-{length}"))
+            def write_lyrics(tmp):
+                with open(tmp, 'w') as f:
+                    json.dump(data, f)
+            _publish(lyrics, write_lyrics)
+        # The archive holds one tone per rate and channel count, so both sets
+        # go in its name or a run with other -r/-C would reuse the wrong one
+        archive_name = f"{length}s-{'+'.join(map(str, rates))}-{'+'.join(map(str, channels))}ch-archive"
+        archive = os.path.join(fixture_dir, f"{archive_name}.zip")
+        if not os.path.exists(archive):
+            # Audio in a subdirectory plus the kind of non-media clutter
+            # that turns up in real uploads
+            def write_archive(tmp):
+                with zipfile.ZipFile(tmp, 'w') as z:
+                    for entry in fixtures:
+                        if entry['length'] == length:
+                            z.write(entry['tone'], f"audio/{os.path.basename(entry['tone'])}")
+                    z.write(lyrics, "lyrics.json")
+                    z.writestr("notes/readme.txt", "synthetic fixture\n")
+                    z.writestr(".DS_Store", "")
+            _publish(archive, write_archive)
+        for entry in fixtures:
+            if entry['length'] == length:
+                entry['lyrics'] = lyrics
+                entry['archive'] = archive
+                entry['archive_name'] = archive_name
+    return fixtures
+
+def find_binaries(work_dir):
+    # Real ffprobe/ffmpeg if installed, otherwise the stubs
+    bins = {}
+    for name, stub in [ ('ffprobe', FFPROBE_STUB), ('ffmpeg', FFMPEG_STUB) ]:
+        found = shutil.which(name)
+        if found is None:
+            found = os.path.join(work_dir, f"{name}-stub")
+            with open(found, 'w') as f:
+                f.write(stub.format(python=sys.executable))
+            os.chmod(found, 0o755)
+        bins[name] = found
+    return bins
+
+def commands(fixture, out, bins):
+    # The tool invocations to time against one fixture, with the seconds
+    # of audio each one processes
+    stamp = os.path.join(HERE, 'stamps', 'example-stamp.wav')
+    length = fixture['length']
+    rate = str(fixture['rate'])
+    cmds = {
+        'wav-mixer': ([ fixture['tone'], fixture['noise'], '-r', rate, '-o', f"{out}/mix.wav" ], 2 * length),
+        'mark-maker': ([ '-i', fixture['tone'], '-s', stamp, '-r', rate, '-o', f"{out}/mark.wav" ], length),
+        'bar-tender': ([ '-i', fixture['tone'], '-o', f"{out}/bars.svg", '-j', f"{out}/bars.json" ], length),
+        'trim-chopper': ([ fixture['tone'], '-o', out, '-t', '1', '-s', '2', '-f', bins['ffmpeg'], '--nonsilent' ], length),
+        'zip-liner': ([ '-i', fixture['archive'], '-o', f"{out}/zip.json", '-f', bins['ffprobe'] ], None),
+    }
+    # The fillers are always two channel, so bleep-blaster only takes stereo
+    if fixture['channels'] == 2:
+        cmds['bleep-blaster'] = ([ fixture['tone'], '-l', fixture['lyrics'],
+                                   '-w', os.path.join(HERE, 'wordlist.json'),
+                                   '-o', f"{out}/bleep.wav" ], length)
+    return cmds
+
+def run_tool(tool, argv, work_dir):
+    metrics = os.path.join(work_dir, 'metrics.jsonl')
+    if os.path.exists(metrics):
+        os.unlink(metrics)
+    start = time.perf_counter()
+    process = subprocess.run([ sys.executable, os.path.join(HERE, tool + '.py') ] + argv + [ '--metrics', metrics ],
+                             cwd=work_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                             universal_newlines=True)
+    wall = time.perf_counter() - start
+    if process.returncode != 0:
+        return { 'error': process.stdout.strip().splitlines()[-1:] }
+    with open(metrics, 'r') as f:
+        record = json.loads(f.readline())
+    # Whatever happened before metrics started (interpreter, module imports,
+    # argument parsing) counts as startup
+    return { 'wall': wall, 'startup': wall - record['wall'],
+             'process_peak_rss_kb': record['process_peak_rss_kb'], 'stages': record['stages'] }
+
+def benchmark(fixtures, bins, work_dir, runs, only):
+    results = {}
+    for fixture in fixtures:
+        out = os.path.join(work_dir, 'out')
+        for tool, (argv, seconds) in commands(fixture, out, bins).items():
+            if only and tool not in only:
+                continue
+            if tool == 'zip-liner':
+                # One archive per length, so only time it once
+                key = f"{tool}/{fixture['archive_name']}"
+                if key in results:
+                    continue
+                seconds = sum(f['length'] for f in fixtures if f['length'] == fixture['length'])
+            else:
+                key = f"{tool}/{fixture['name']}"
+            samples = []
+            for _ in range(runs):
+                shutil.rmtree(out, ignore_errors=True)
+                os.makedirs(out)
+                sample = run_tool(tool, argv, work_dir)
+                if 'error' in sample:
+                    samples = sample
+                    break
+                samples.append(sample)
+            if isinstance(samples, dict):
+                results[key] = samples
+                print(f"{key:<40} failed: {' '.join(samples['error'])}")
+                continue
+            best = min(samples, key=lambda s: s['wall'])
+            result = { 'wall': statistics.median(s['wall'] for s in samples),
+                       'startup': statistics.median(s['startup'] for s in samples),
+                       'process_peak_rss_kb': max(s['process_peak_rss_kb'] for s in samples),
+                       'audio_seconds': seconds,
+                       'stages': best['stages'] }
+            result['throughput'] = seconds / result['wall']
+            results[key] = result
+            print(f"{key:<40}{result['wall']:>8.2f}s{result['throughput']:>9.1f}x{result['startup']:>7.2f}s{result['process_peak_rss_kb']/1024:>8.1f}MiB")
+    return results
+
+def compare(baseline, current, threshold):
+    # Flag anything slower or bigger than the baseline by more than threshold%
+    regressions = 0
+    for key, now in current.items():
+        then = baseline.get(key)
+        if then is None or 'wall' not in then:
+            continue
+        if 'wall' not in now:
+            # Worked in the baseline and fails now
+            regressions += 1
+            print(f" -- REGRESSION {key}: failed: {' '.join(now.get('error', []))}")
+            continue
+        for metric in [ 'wall', 'process_peak_rss_kb', 'startup' ]:
+            if then.get(metric, 0) <= 0:
+                continue
+            change = (now[metric] - then[metric]) / then[metric] * 100
+            if change > threshold:
+                regressions += 1
+                print(f" -- REGRESSION {key} {metric}: {then[metric]:.3f} -> {now[metric]:.3f} (+{change:.1f}%)")
+    # Not counted: -t/-l/-r/-C can narrow a run on purpose
+    for key in baseline:
+        if key not in current:
+            print(f" -- MISSING {key}: in the baseline but not in this run")
+    return regressions
+
+def main():
+    # Parse the args
+    DESC="""
+    This is a really basic benchmark suite for the wav tools. It builds
+    deterministic synthetic fixtures, times each tool against them and
+    saves or compares JSON baselines
+    """
+    parser = argparse.ArgumentParser(description=DESC)
+    parser.add_argument("-o", "--output", required=False, help = "write JSON results to file")
+    parser.add_argument("-c", "--compare", required=False, help = "JSON baseline to compare against (exit 1 on regression)")
+    parser.add_argument("-T", "--threshold", required=False, help = f"percent slowdown/growth that counts as a regression (default: {THRESHOLD})")
+    parser.add_argument("-n", "--runs", required=False, help = f"runs per tool and fixture, median is kept (default: {RUNS})")
+    parser.add_argument("-l", "--lengths", required=False, help = "comma separated fixture lengths in seconds (default: 5,30)")
+    parser.add_argument("-r", "--rates", required=False, help = "comma separated fixture sample rates (default: 22050,44100)")
+    parser.add_argument("-C", "--channels", required=False, help = "comma separated fixture channel counts (default: 1,2)")
+    parser.add_argument("-t", "--tools", required=False, help = "comma separated tools to run (default: all)")
+    parser.add_argument("-F", "--fixtures", required=False, help = f"directory for generated fixtures (default: {FIXTURE_DIR})")
+    parser.add_argument("-W", "--work", required=False, help = "directory for tool output and stub binaries (default: a new temporary directory, removed afterwards)")
+    args = parser.parse_args()
+
+    lengths = [ int(x) for x in args.lengths.split(',') ] if args.lengths else LENGTHS
+    rates = [ int(x) for x in args.rates.split(',') ] if args.rates else RATES
+    channels = [ int(x) for x in args.channels.split(',') ] if args.channels else CHANNELS
+    only = args.tools.split(',') if args.tools else None
+    runs = int(args.runs) if args.runs is not None else RUNS
+    threshold = float(args.threshold) if args.threshold is not None else THRESHOLD
+    fixture_dir = args.fixtures if args.fixtures is not None else FIXTURE_DIR
+
+    print("Generating fixtures...")
+    fixtures = make_fixtures(fixture_dir, lengths, rates, channels)
+    if args.work is not None:
+        work_dir = args.work
+        os.makedirs(work_dir, exist_ok=True)
+    else:
+        work_dir = tempfile.mkdtemp(prefix='wav-bench-')
+    try:
+        bins = find_binaries(work_dir)
+        print(f"Using ffprobe {bins['ffprobe']} and ffmpeg {bins['ffmpeg']}")
+        print(f"{'benchmark':<40}{'wall':>9}{'speed':>10}{'start':>8}{'rss':>11}")
+        results = benchmark(fixtures, bins, work_dir, runs, only)
+    finally:
+        if args.work is None:
+            shutil.rmtree(work_dir)
+
+    if args.output is not None:
+        rev = subprocess.run([ 'git', 'rev-parse', 'HEAD' ], cwd=HERE,
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                             universal_newlines=True).stdout.strip()
+        with open(args.output, 'w') as f:
+            json.dump({ 'meta': { 'time': time.time(), 'revision': rev,
+                                  'python': platform.python_version(),
+                                  'platform': platform.platform(), 'runs': runs,
+                                  'fixtures': GENERATOR },
+                        'results': results }, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, 'r') as f:
+            saved = json.load(f)
+        if saved['meta'].get('fixtures') != GENERATOR:
+            print(f" -- WARNING: baseline was run on fixtures from generator {saved['meta'].get('fixtures')}, not {GENERATOR}")
+        baseline = saved['results']
+        if compare(baseline, results, threshold):
+            sys.exit(1)
+        print("No regressions")
+
+if __name__ == '__main__':
+    main()
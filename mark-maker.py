@@ -2,76 +2,15 @@
 
 import argparse
 import sys
-import time
-import soundfile
-import librosa
-import numpy as np
+import wavcore
+from wavcore import print_timer
+from wavcore.watermark import generate_watermark, apply_watermark
 
 SAMPLE_RATE=44100
 MARK_STRENGTH = 4
 SILENCE_DELAY = 5
 SILENCE_GAP = 5
 
-# Timer helper function
-time_start = time.perf_counter()
-time_last = 0
-def print_timer():
-    global time_start, time_last
-    now = time.perf_counter()
-    print("[%05.2f][%05.2f]" % (now-time_start, now-time_last), end=" ")
-    time_last = now
-
-
-def generate_watermark(target_shape, stamp):
-    # Build either a stereo or a mono watermark track based on input type
-    if len(target_shape) == 2:
-        print_timer()
-        print(" - Generating STEREO watermark...")
-        return _generate_stereo_watermark(target_shape, stamp)
-    else:
-        print_timer()
-        print(" - Generating MONO watermark...")
-        return _generate_mono_watermark(target_shape, stamp)
-
-def _generate_mono_watermark(target_shape, stamp):
-    y_stamp, sr = librosa.load(stamp, sr=SAMPLE_RATE, mono=True)
-    silence_gap = np.zeros(sr*SILENCE_GAP, dtype=np.float32)
-
-    # Start with SILENCE_DELAY seconds of silence and then build
-    watermark = np.zeros(sr*SILENCE_DELAY, dtype=np.float32)
-    while watermark.shape[0] < target_shape[0]:
-        watermark = np.concatenate((watermark, y_stamp))
-        watermark = np.concatenate((watermark, silence_gap))
-    # Trim the watermark to the same size as requested
-    watermark = watermark[:target_shape[0]]
-    return watermark
-
-def _generate_stereo_watermark(target_shape, stamp):
-    # Load the stamp as mono and build a silence track of the same length
-    y_stamp, sr = librosa.load(stamp, sr=SAMPLE_RATE, mono=True)
-    y_stamp_silent = np.zeros(y_stamp.shape)
-    # Make a number of versions with different stereo placement
-    versions = []
-    farleft = np.array([y_stamp, y_stamp_silent], dtype=np.float32)
-    midleft = np.array([y_stamp*0.8, y_stamp*0.2], dtype=np.float32)
-    nearleft = np.array([y_stamp*0.6, y_stamp*0.4], dtype=np.float32)
-    farright = np.array([y_stamp_silent, y_stamp], dtype=np.float32)
-    midright = np.array([y_stamp*0.2, y_stamp*0.8], dtype=np.float32)
-    nearright = np.array([y_stamp*0.4, y_stamp*0.6], dtype=np.float32)
-    center = np.array([y_stamp*0.5, y_stamp*0.5], dtype=np.float32)
-    versions = [ farleft, midleft, nearleft, center, nearright, midright, farright ]
-    silence_gap = np.zeros((2,sr*SILENCE_GAP), dtype=np.float32)
-
-    # Start with SILENCE_DELAY seconds of silence and then build
-    watermark = np.zeros((2,sr*SILENCE_DELAY), dtype=np.float32)
-    while watermark.shape[1] < target_shape[1]:
-        this_stamp = versions[int(np.random.random() * len(versions))]
-        watermark = np.concatenate((watermark.T, this_stamp.T)).T
-        watermark = np.concatenate((watermark.T, silence_gap.T)).T
-    # Trim the watermark to the same size as requested
-    watermark = watermark.T[:target_shape[1]].T
-    return watermark
-
 
 def main():
     print_timer()
@@ -94,7 +33,9 @@ def main():
     parser.add_argument("-d", "--delay", required=False, help = "silence (in seconds) before first stamp (default: 5)")
     parser.add_argument("-g", "--gap", required=False, help = "silence (in seconds) between subsequent stamps (default: 5)")
     parser.add_argument("-r", "--rate", required=False, help = "resample all inputs to this rate (default: 44100)")
+    wavcore.metrics.add_arguments(parser)
     args = parser.parse_args()
+    wavcore.metrics.start(args)
 
     outfile = args.output
     file = args.input
@@ -110,16 +51,15 @@ def main():
 
     print_timer()
     print(" * Reading input filename \"" + file + "\"...")
-    y, sr = librosa.load(file, sr=SAMPLE_RATE, mono=False)
+    y, sr = wavcore.load(file, sr=SAMPLE_RATE, mono=False)
     print_timer()
     print(" - Generating watermark content...")
-    y_wtrm = generate_watermark(y.shape, stamp)
+    y_wtrm = generate_watermark(y.shape, stamp, SAMPLE_RATE, SILENCE_DELAY, SILENCE_GAP)
 
     print_timer()
     print(" - Mixing audio tracks...")
-    # Mix the watermark into the wav
-    y_out = (y + (y_wtrm * MARK_STRENGTH))
-    soundfile.write(outfile, y_out.T, sr)
+    y_out = apply_watermark(y, y_wtrm, MARK_STRENGTH)
+    wavcore.write(outfile, y_out, sr)
     print_timer()
     print(" - Finished writing output to \"" + outfile + "\"...")
 
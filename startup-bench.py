@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+RUNS = 5
+HERE = os.path.dirname(os.path.abspath(__file__))
+MISSING = 'missing-input.wav'
+
+# Each tool is pointed at an input that doesn't exist, so a run covers the
+# interpreter, every import the tool does before touching audio, argument
+# parsing and the first open, and then stops. zip-liner gets an empty zip.
+TOOLS = {
+    'wav-mixer':     [ MISSING, MISSING, '-o', 'out.wav' ],
+    'mark-maker':    [ '-i', MISSING, '-o', 'out.wav', '-s', MISSING ],
+    'bar-tender':    [ '-i', MISSING, '-o', 'out.svg' ],
+    'trim-chopper':  [ MISSING, '-o', '.' ],
+    'bleep-blaster': [ MISSING, '-u', 'cut.json', '-o', 'out.wav' ],
+    'zip-liner':     [ '-i', 'empty.zip', '-o', 'out.json' ],
+}
+
+def git(*args):
+    return subprocess.run([ 'git' ] + list(args), cwd=HERE, check=True,
+                          stdout=subprocess.PIPE, universal_newlines=True).stdout.strip()
+
+def checkout(ref, dest):
+    # A copy of the tree at ref, without touching the working tree
+    archive = subprocess.Popen([ 'git', 'archive', ref ], cwd=HERE, stdout=subprocess.PIPE)
+    subprocess.run([ 'tar', '-x', '-C', dest ], stdin=archive.stdout, check=True)
+    archive.wait()
+
+def time_tool(tree, tool, argv, cwd, runs):
+    # Median wall time of fresh launches, or None if an import is missing
+    script = os.path.join(tree, tool + '.py')
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.run([ sys.executable, script ] + argv, cwd=cwd,
+                                 stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                 universal_newlines=True)
+        elapsed = time.perf_counter() - start
+        if 'ModuleNotFoundError' in process.stdout or 'ImportError' in process.stdout:
+            return None
+        times.append(elapsed)
+    return statistics.median(times)
+
+def main():
+    # Parse the args
+    DESC="""
+    This is a really basic tool to measure cold-start time for each of the
+    wav tools, comparing a baseline revision against the working tree
+    """
+    parser = argparse.ArgumentParser(description=DESC)
+    parser.add_argument("-b", "--baseline", required=False, help = "git revision to compare against (default: the first commit)")
+    parser.add_argument("-n", "--runs", required=False, help = f"interpreter launches per measurement (default: {RUNS})")
+    parser.add_argument("-o", "--output", required=False, help = "write JSON results to file")
+    args = parser.parse_args()
+    runs = int(args.runs) if args.runs is not None else RUNS
+    baseline = args.baseline
+    if baseline is None:
+        baseline = git('rev-list', '--max-parents=0', 'HEAD').splitlines()[0]
+
+    scratch = tempfile.mkdtemp(prefix='startup-bench-')
+    try:
+        tree = os.path.join(scratch, 'baseline')
+        cwd = os.path.join(scratch, 'cwd')
+        os.makedirs(tree)
+        os.makedirs(cwd)
+        checkout(baseline, tree)
+        zipfile.ZipFile(os.path.join(cwd, 'empty.zip'), 'w').close()
+
+        results = {}
+        print(f"Baseline {baseline[:12]} vs working tree")
+        print(f"{'tool':<15}{'before':>10}{'after':>10}{'saved':>10}")
+        for tool, argv in TOOLS.items():
+            t_before = time_tool(tree, tool, argv, cwd, runs)
+            t_after = time_tool(HERE, tool, argv, cwd, runs)
+            results[tool] = { 'before': t_before, 'after': t_after }
+            fmt = lambda t: f"{t:>10.3f}" if t is not None else f"{'missing':>10}"
+            saved = t_before - t_after if t_before is not None and t_after is not None else None
+            print(f"{tool:<15}{fmt(t_before)}{fmt(t_after)}{fmt(saved)}")
+    finally:
+        shutil.rmtree(scratch)
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump({ 'baseline': baseline, 'results': results }, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -4,9 +4,11 @@ import os
 import shutil
 import argparse
 import sys
-import time
 import uuid
 import subprocess
+import wavcore
+from wavcore import print_timer, wavmap
+from wavcore.edit import segment_bounds
 
 TRIM = 5
 SIZE = 30
@@ -14,16 +16,6 @@ MAX = 0
 WORK_DIR = '/tmp/SCRATCH'
 FFMPEG_BIN = '/usr/bin/ffmpeg'
 
-# Timer helper function
-time_start = time.perf_counter()
-time_last = 0
-
-def print_timer():
-    global time_start, time_last
-    now = time.perf_counter()
-    print("[%05.2f][%05.2f]" % (now-time_start, now-time_last), end=" ")
-    time_last = now
-
 # Copied helper functions from lab-director's helpers.py
 def make_nonsilent_wave(infile, outfile):
     # Build the command line to run
@@ -65,8 +57,12 @@ parser.add_argument("-o", "--output", required=True, help = "write segments to o
 parser.add_argument("-t", "--trim", required=False, help = "seconds to from start and end of input (default: 5)")
 parser.add_argument("-s", "--size", required=False, help = "length (in seconds) of each segment (default: 30)")
 parser.add_argument("-m", "--max", required=False, help = "max number of segments to output (default: all)")
+parser.add_argument("-f", "--ffmpeg", required=False, help = "path to ffmpeg binary to use")
+parser.add_argument("-w", "--wav", default=False, action=argparse.BooleanOptionalAction, help = "write WAV segments instead of MP3 (plain WAV input is copied without re-encoding)")
 parser.add_argument("-n", "--nonsilent", default=False, action=argparse.BooleanOptionalAction, help = "automatically remove silence from segments")
+wavcore.metrics.add_arguments(parser)
 args = parser.parse_args()
+wavcore.metrics.start(args)
 
 output = args.output
 file = args.file
@@ -76,18 +72,16 @@ if args.size is not None:
     SIZE = float(args.size)
 if args.max is not None:
     MAX = float(args.max)
+if args.ffmpeg is not None:
+    FFMPEG_BIN = args.ffmpeg
 
 print_timer()
 print("Starting trim-chopper...")
 print_timer()
 print(f" - Using trim of {TRIM} and segment size {SIZE}")
 print_timer()
-print(" - Loading librosa...")
-import librosa
+print(" - Loading soundfile...")
 import soundfile as sf
-print_timer()
-print(" - Loading numpy...")
-import numpy as np
 if args.nonsilent:
     print_timer()
     print(f" * Removing silence from file \"{file}\"...")
@@ -97,31 +91,43 @@ if args.nonsilent:
     make_nonsilent_wave(file, nonsilent)
     file = nonsilent
 print_timer()
-print(" * Loading filename \"" + file + "\"...")
-y, sr = librosa.load(file, sr=None, mono=False)
-if args.nonsilent:
-    destroy_scratch_dir(scratch)
-print_timer()
-print(" * Doing math...")
-trimmed = y.T[int(TRIM*sr):-1*int(TRIM*sr)] if TRIM != 0 else y.T
-SIZE = len(trimmed) / sr if SIZE == 0 else SIZE
-s_count = int(len(trimmed) / (SIZE*sr))
-s_count = MAX if MAX > 0 and s_count > MAX else s_count
+print(" * Opening filename \"" + file + "\"...")
+filebase = f"{output}/{str(uuid.uuid4())}"
+ext = "wav" if args.wav else "mp3"
+# WAV segments from a plain WAV are copied straight out of a memory map
+wm = wavmap.open_map(file) if args.wav else None
+if wm is not None:
+    with wm:
+        print_timer()
+        print(" * Doing math...")
+        bounds = list(segment_bounds(wm.frames, wm.samplerate, TRIM, SIZE, MAX))
 
-counter = 0
-segments = []
-while counter < s_count:
-    segment = trimmed[int(counter*SIZE*sr):int((counter+1)*SIZE*sr)]
-    segments.append(segment)
-    counter += 1
+        print_timer()
+        print(f" * Breaking into {len(bounds)} pieces...")
+        for x, (start, stop) in enumerate(bounds):
+            print_timer()
+            print(f" - Copying segment {x:02} to file...")
+            wm.write_frames(filebase + f"-{x:02}.{ext}", start, stop)
+else:
+    # Only read the frames each segment needs instead of decoding everything
+    with sf.SoundFile(file) as f:
+        sr = f.samplerate
+        print_timer()
+        print(" * Doing math...")
+        bounds = list(segment_bounds(f.frames, sr, TRIM, SIZE, MAX))
 
-print_timer()
-print(f" * Breaking into {len(segments)} pieces...")
-filebase = f"{output}/{str(uuid.uuid4())}"
-for x, s in enumerate(segments):
-    print_timer()
-    print(f" - Writing segment {x:02} to file...")
-    sf.write(filebase + f"-{x:02}.mp3", s, sr)
+        print_timer()
+        print(f" * Breaking into {len(bounds)} pieces...")
+        for x, (start, stop) in enumerate(bounds):
+            with wavcore.metrics.span('decode'):
+                f.seek(start)
+                segment = f.read(stop - start, dtype='float32')
+            wavcore.metrics.count('samples_read', segment.size)
+            print_timer()
+            print(f" - Writing segment {x:02} to file...")
+            wavcore.write(filebase + f"-{x:02}.{ext}", segment.T, sr)
+if args.nonsilent:
+    destroy_scratch_dir(scratch)
 
 print_timer()
 print("Done")
@@ -2,21 +2,13 @@
 
 import argparse
 import sys
-import time
+import wavcore
+from wavcore import print_timer
+from wavcore.edit import mix
 
 SAMPLE_RATE=44100
 BIT_DEPTH = 16
 
-# Timer helper function
-time_start = time.perf_counter()
-time_last = 0
-
-def print_timer():
-    global time_start, time_last
-    now = time.perf_counter()
-    print("[%05.2f][%05.2f]" % (now-time_start, now-time_last), end=" ")
-    time_last = now
-
 # Parse the args
 DESC="""
 This is a really basic tool to mix multiple wav files
@@ -27,7 +19,9 @@ parser.add_argument("files", nargs="+", help="input wav files (need at least 2)"
 parser.add_argument("-r", "--rate", required=False, help = "resample all inputs to this rate (default: 44100)")
 parser.add_argument("-b", "--bitdepth", required=False, help = "bits per sample for output file (default: 16)")
 parser.add_argument("-o", "--output", required=True, help = "write wav output to file")
+wavcore.metrics.add_arguments(parser)
 args = parser.parse_args()
+wavcore.metrics.start(args)
 
 output = args.output
 files = args.files
@@ -59,32 +53,25 @@ print("Starting wav_mixer...")
 import soundfile
 print_timer()
 print(" - Done loading soundfile...")
-import librosa
-print_timer()
-print(" - Done loading librosa...")
 
 # Load the input file data
 data = []
 for file in files:
     print_timer()
     print(" * Starting filename \"" + file + "\"...")
-    y, sr = librosa.load(file, sr=SAMPLE_RATE, mono=False)
+    y, sr = wavcore.load(file, sr=SAMPLE_RATE, mono=False)
     data.append((y,sr))
     print_timer()
     print(" * Finished filename \"" + file + "\"...")
 
 print_timer()
 print(" - Mix audio tracks...")
-# Accumulators for mixing, starting with first track
-y_out = data[0][0]
-
-for d in data[1:]:
-    y_out = y_out + d[0]
+y_out = mix([ y for y, sr in data ])
 
 print_timer()
 print(" - Finished mixing...")
 
-soundfile.write(output, y_out.T, sr, subtype=subtype)
+wavcore.write(output, y_out, sr, subtype=subtype)
 print_timer()
 print(" - Finished writing output to \"" + output + "\"...")
 
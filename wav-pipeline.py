@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import json
+import wavcore
+from wavcore import print_timer
+
+SAMPLE_RATE = 44100
+BIT_DEPTH = 16
+SUBTYPES = { 8: 'PCM_U8', 16: 'PCM_16', 24: 'PCM_24', 32: 'FLOAT' }
+
+# Each op mirrors one of the CLIs: how it reads its input (the same
+# wavcore.load arguments the CLI uses), what it does, and the subtype the CLI
+# would have written (None for soundfile's default) so a chained run can be
+# reproduced exactly. The exception is trim: trim-chopper writes MP3 by
+# default, and the lossy encode isn't reproduced here, so anything downstream
+# of a trim stage only matches trim-chopper --wav on 16-bit input
+
+def op_trim(stage, inputs):
+    from wavcore.edit import trim
+    y, sr = wavcore.conform(*inputs[0], sr=None, mono=False)
+    try:
+        y = trim(y, sr, stage.get('trim', 5), stage.get('size', 30), stage.get('index', 0))
+    except IndexError:
+        sys.exit(f" -- ERROR: input too short for segment {stage.get('index', 0)}")
+    return y, sr, None
+
+def op_bleep(stage, inputs):
+    from wavcore.bleep import BLEEP_TYPES, build_cutlist, apply_cutlist
+    y, sr = wavcore.conform(*inputs[0], sr=None, mono=False)
+    bleep = stage.get('bleep', BLEEP_TYPES[0])
+    if 'user' in stage:
+        with open(stage['user'], 'r') as f:
+            cutdata = json.load(f)
+        bleep = cutdata.get('bleep', bleep)
+        cutlist = [tuple(x) for x in cutdata['radioCutlist']]
+    else:
+        with open(stage['lyrics'], 'r') as f:
+            lyrics = json.load(f)
+        cutlist = build_cutlist(lyrics, wavcore.load_json(stage['wordlist']))
+    y = apply_cutlist(y, sr, cutlist, bleep, stage.get('buffer', 5), stage.get('mark', 4))
+    if 'cutout' in stage:
+        with open(stage['cutout'], 'w') as f:
+            f.write(json.dumps(cutlist))
+    return y, sr, None
+
+def op_watermark(stage, inputs):
+    from wavcore.watermark import generate_watermark, apply_watermark
+    rate = stage.get('rate', SAMPLE_RATE)
+    y, sr = wavcore.conform(*inputs[0], sr=rate, mono=False)
+    y_wtrm = generate_watermark(y.shape, stage['stamp'], rate,
+                                stage.get('delay', 5), stage.get('gap', 5))
+    return apply_watermark(y, y_wtrm, stage.get('mark', 4)), sr, None
+
+def op_mix(stage, inputs):
+    from wavcore.edit import mix
+    if len(inputs) < 2:
+        sys.exit(" -- ERROR: mix stage needs at least two inputs")
+    rate = stage.get('rate', SAMPLE_RATE)
+    tracks = [ wavcore.conform(y, sr, sr=rate, mono=False) for y, sr in inputs ]
+    return mix([ y for y, sr in tracks ]), tracks[-1][1], SUBTYPES.get(stage.get('bitdepth', BIT_DEPTH))
+
+def op_bars(stage, inputs):
+    from wavcore.bars import rms_json, rms_bars, draw_bars, BARS, STEP, WIDTH, HEIGHT, MAX
+    y, sr = wavcore.conform(*inputs[0], sr=None, mono=True)
+    if 'jsonout' in stage:
+        with open(stage['jsonout'], 'w') as f:
+            json.dump(rms_json(y, sr, stage.get('jsoninterval', 10), stage.get('jsonmax', 255)), f)
+    bars = stage.get('bars', BARS)
+    vals, factor = rms_bars(y, bars, stage.get('factor', 0), stage.get('max', MAX))
+    if 'ffile' in stage:
+        with open(stage['ffile'], 'w') as f:
+            json.dump({'factor': float(factor)}, f)
+    color = stage.get('color', '000000')
+    color = tuple(int(color[i:i+2], 16) / 255 for i in (0, 2, 4))
+    draw_bars(stage['output'], vals, bars, stage.get('step', STEP),
+              stage.get('width', WIDTH), stage.get('height', HEIGHT), color,
+              stage.get('invert', False), stage.get('mirror', False), stage.get('pngout'))
+    return None
+
+OPS = { 'trim': op_trim,
+        'bleep': op_bleep,
+        'watermark': op_watermark,
+        'mix': op_mix,
+        'bars': op_bars }
+
+def stage_inputs(stage):
+    return stage['inputs'] if 'inputs' in stage else [ stage['input'] ]
+
+def plan(spec):
+    # Order the stages so every stage runs after the ones it reads from
+    stages = spec['stages']
+    for name in stages:
+        if name in spec['inputs']:
+            sys.exit(f" -- ERROR: stage \"{name}\" has the same name as an input")
+    order, state = [], {}
+    def visit(name, path):
+        if name in spec['inputs']:
+            return
+        if name not in stages:
+            sys.exit(f" -- ERROR: unknown stage or input \"{name}\"")
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            sys.exit(" -- ERROR: pipeline has a cycle: " + " -> ".join(path + [name]))
+        if stages[name].get('op') not in OPS:
+            sys.exit(f" -- ERROR: stage \"{name}\" has unknown op \"{stages[name].get('op')}\"")
+        state[name] = 'visiting'
+        for dep in stage_inputs(stages[name]):
+            if stages.get(dep, {}).get('op') == 'bars':
+                sys.exit(f" -- ERROR: stage \"{name}\" can't read from bars stage \"{dep}\"")
+            visit(dep, path + [name])
+        state[name] = 'done'
+        order.append(name)
+    for name in stages:
+        visit(name, [])
+    return order
+
+def main():
+    print_timer()
+    print("Starting wav-pipeline...")
+
+    # Parse the args
+    DESC="""
+    This is a really basic tool to run several of the wav tools as one
+    pipeline described by a JSON file, decoding each input only once
+    """
+    parser = argparse.ArgumentParser(description=DESC)
+    parser.add_argument("pipeline", help = "JSON file describing inputs and stages")
+    parser.add_argument("-x", "--exact", default=True, action=argparse.BooleanOptionalAction, help = "quantize between stages like the chained CLIs do, except that trim stages match trim-chopper --wav, not its default MP3 output (default: on)")
+    parser.add_argument("-S", "--seed", required=False, help = "seed numpy's RNG for fuzz bleeps and stereo stamp placement")
+    wavcore.metrics.add_arguments(parser)
+    args = parser.parse_args()
+    wavcore.metrics.start(args)
+
+    with open(args.pipeline, 'r') as f:
+        spec = json.load(f)
+    spec.setdefault('inputs', {})
+    order = plan(spec)
+    if args.seed is not None:
+        import numpy as np
+        np.random.seed(int(args.seed))
+
+    # Count readers so buffers can be dropped once nothing needs them
+    readers = {}
+    for name in order:
+        for dep in stage_inputs(spec['stages'][name]):
+            readers[dep] = readers.get(dep, 0) + 1
+
+    buffers = {}
+    for name, path in spec['inputs'].items():
+        print_timer()
+        print(f" * Loading input \"{name}\" from \"{path}\"...")
+        buffers[name] = wavcore.load(path, sr=None, mono=False)
+
+    for name in order:
+        stage = spec['stages'][name]
+        print_timer()
+        print(f" * Running {stage['op']} stage \"{name}\"...")
+        deps = stage_inputs(stage)
+        result = OPS[stage['op']](stage, [ buffers[dep] for dep in deps ])
+        for dep in deps:
+            readers[dep] -= 1
+            if readers[dep] == 0:
+                del buffers[dep]
+        if result is None:
+            continue
+        y, sr, subtype = result
+        if 'output' in stage:
+            print_timer()
+            print(f" - Writing \"{name}\" to \"{stage['output']}\"...")
+            wavcore.write(stage['output'], y, sr, subtype=stage.get('subtype', subtype))
+        if readers.get(name, 0) > 0:
+            if args.exact:
+                # Same samples the next CLI would have read back from disk
+                y = wavcore.roundtrip(y, sr, subtype=stage.get('subtype', subtype))
+            buffers[name] = (y, sr)
+
+    print_timer()
+    print("Done")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+import os
+import io
+import re
+import sys
+import json
+import time
+import glob
+import runpy
+import asyncio
+import argparse
+import contextlib
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+
+SOCKET = '/tmp/wav-worker.sock'
+WORKERS = os.cpu_count() or 1
+QUEUE = 16
+HERE = os.path.dirname(os.path.abspath(__file__))
+TOOLS = { 'wav-mixer', 'mark-maker', 'bar-tender',
+          'bleep-blaster', 'trim-chopper', 'zip-liner' }
+TIMER_LINE = re.compile(r'^\[(\d+\.\d+)\]\[(\d+\.\d+)\] ?(.*)$')
+
+def _warm_worker():
+    # Runs once in each pool process: pay for the heavy imports and the
+    # shared assets up front so every job after this starts hot
+    sys.path.insert(0, HERE)
+    for module in [ 'numpy', 'soundfile', 'librosa', 'cairo' ]:
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+    import wavcore
+    wordlist = os.path.join(HERE, 'wordlist.json')
+    if os.path.exists(wordlist):
+        wavcore.load_json(wordlist)
+    for stamp in glob.glob(os.path.join(HERE, 'stamps', '*.wav')):
+        try:
+            wavcore.load_asset(stamp, sr=44100, mono=True)
+        except (ImportError, RuntimeError):
+            pass
+
+def _parse_timings(output):
+    # Turn the print_timer() markers into per-stage timings
+    timings = []
+    for line in output.splitlines():
+        match = TIMER_LINE.match(line)
+        if match:
+            timings.append({ 'elapsed': float(match.group(1)),
+                             'delta': float(match.group(2)),
+                             'stage': match.group(3).strip() })
+    return timings
+
+def _run_job(tool, argv, cwd):
+    # Execute a tool script in this warm process as if from the command line
+    import wavcore
+    script = os.path.join(HERE, tool + '.py')
+    saved_argv, saved_cwd = sys.argv, os.getcwd()
+    output = io.StringIO()
+    returncode = 0
+    metrics = None
+    start = time.perf_counter()
+    try:
+        os.chdir(cwd)
+        sys.argv = [ script ] + argv
+        wavcore.reset_timer()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            try:
+                runpy.run_path(script, run_name='__main__')
+            finally:
+                metrics = wavcore.metrics.finish()
+    except SystemExit as e:
+        if isinstance(e.code, int):
+            returncode = e.code
+        elif e.code is not None:
+            output.write(str(e.code) + "\n")
+            returncode = 1
+    except Exception as e:
+        output.write(f"{type(e).__name__}: {e}\n")
+        returncode = 1
+    finally:
+        sys.argv = saved_argv
+        os.chdir(saved_cwd)
+    text = output.getvalue()
+    return { 'returncode': returncode,
+             'output': text,
+             'timings': _parse_timings(text),
+             'metrics': metrics,
+             'run': time.perf_counter() - start }
+
+class Server:
+    def __init__(self, workers, queue):
+        self.workers = workers
+        self.pool = self.new_pool()
+        self.slots = asyncio.Semaphore(workers)
+        self.queue = queue
+        self.pending = 0
+
+    def new_pool(self):
+        return concurrent.futures.ProcessPoolExecutor(max_workers=self.workers,
+                                                      initializer=_warm_worker)
+
+    def restart_pool(self, broken):
+        # A worker died (segfault, SIGBUS, OOM kill) and took the pool with
+        # it; only the first job to notice replaces it
+        if self.pool is broken:
+            print("Worker process died, restarting pool...")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.pool = self.new_pool()
+
+    async def handle(self, reader, writer):
+        try:
+            line = await reader.readline()
+            reply = await self.dispatch(line)
+        except Exception as e:
+            reply = { 'ok': False, 'error': f"{type(e).__name__}: {e}" }
+        writer.write((json.dumps(reply) + "\n").encode())
+        await writer.drain()
+        writer.close()
+
+    async def dispatch(self, line):
+        job = json.loads(line)
+        tool = job.get('tool')
+        if tool not in TOOLS:
+            return { 'ok': False, 'error': f"unknown tool: {tool}" }
+        # Backpressure: refuse new work once the queue is full, and only let
+        # as many jobs into the pool as there are workers
+        if self.pending >= self.queue:
+            return { 'ok': False, 'error': 'busy' }
+        self.pending += 1
+        try:
+            queued = time.perf_counter()
+            async with self.slots:
+                wait = time.perf_counter() - queued
+                loop = asyncio.get_running_loop()
+                run = (_run_job, tool, job.get('args', []), job.get('cwd', os.getcwd()))
+                pool = self.pool
+                try:
+                    future = loop.run_in_executor(pool, *run)
+                except BrokenProcessPool:
+                    # Broken before this job got in, so it can still run
+                    self.restart_pool(pool)
+                    pool = self.pool
+                    future = loop.run_in_executor(pool, *run)
+                try:
+                    result = await future
+                except BrokenProcessPool:
+                    self.restart_pool(pool)
+                    return { 'ok': False, 'error': 'worker process died running this job' }
+        finally:
+            self.pending -= 1
+        result['ok'] = result['returncode'] == 0
+        result['wait'] = wait
+        return result
+
+async def serve(socket_path, workers, queue):
+    server = Server(workers, queue)
+    # Start every worker now rather than on the first job
+    await asyncio.gather(*[ asyncio.get_running_loop().run_in_executor(server.pool, time.sleep, 0)
+                            for _ in range(workers) ])
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    unix = await asyncio.start_unix_server(server.handle, path=socket_path)
+    print(f"Serving {workers} workers on {socket_path}...")
+    try:
+        async with unix:
+            await unix.serve_forever()
+    finally:
+        server.pool.shutdown()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+def run(socket_path, tool, argv, timings):
+    import socket
+    job = { 'tool': tool, 'args': argv, 'cwd': os.getcwd() }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try:
+            s.connect(socket_path)
+            s.sendall((json.dumps(job) + "\n").encode())
+            with s.makefile('r') as f:
+                line = f.readline()
+        except (FileNotFoundError, ConnectionRefusedError):
+            sys.exit(f" -- ERROR: no worker is serving on {socket_path}, start one with 'serve'")
+        except OSError as e:
+            sys.exit(f" -- ERROR: lost the worker on {socket_path}: {e}")
+    if not line:
+        sys.exit(f" -- ERROR: the worker on {socket_path} closed the connection without replying")
+    reply = json.loads(line)
+    if 'output' not in reply:
+        sys.exit(" -- ERROR: " + reply.get('error', 'no reply from worker'))
+    print(reply['output'], end="")
+    if timings:
+        print(json.dumps({ 'wait': reply['wait'], 'run': reply['run'],
+                           'timings': reply['timings'],
+                           'metrics': reply['metrics'] }, indent=2))
+    return reply['returncode']
+
+def main():
+    # Parse the args
+    DESC="""
+    This is a really basic resident worker for the wav tools. 'serve' keeps
+    the heavy libraries and shared assets loaded and takes jobs over a Unix
+    socket, 'run' sends one job using the tool's usual arguments
+    """
+    parser = argparse.ArgumentParser(description=DESC)
+    parser.add_argument("-S", "--socket", required=False, help = f"path of the Unix socket (default: {SOCKET})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_serve = sub.add_parser("serve", help = "start the worker daemon")
+    p_serve.add_argument("-w", "--workers", required=False, help = "number of worker processes (default: cpu count)")
+    p_serve.add_argument("-q", "--queue", required=False, help = f"max jobs queued or running before refusing new ones (default: {QUEUE})")
+    p_run = sub.add_parser("run", help = "run a tool on the worker daemon")
+    p_run.add_argument("-T", "--timings", default=False, action=argparse.BooleanOptionalAction, help = "print per-stage timings as JSON")
+    p_run.add_argument("tool", choices=sorted(TOOLS), help = "tool to run")
+    p_run.add_argument("args", nargs=argparse.REMAINDER, help = "arguments for the tool, as on the command line")
+    args = parser.parse_args()
+
+    socket_path = args.socket if args.socket is not None else SOCKET
+    if args.command == "serve":
+        workers = int(args.workers) if args.workers is not None else WORKERS
+        queue = int(args.queue) if args.queue is not None else QUEUE
+        try:
+            asyncio.run(serve(socket_path, workers, queue))
+        except KeyboardInterrupt:
+            pass
+    else:
+        sys.exit(run(socket_path, args.tool, args.args, args.timings))
+
+if __name__ == '__main__':
+    main()
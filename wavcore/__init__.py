@@ -0,0 +1,10 @@
+# Shared helpers for the wav tools in this repo. Importing this package is
+# cheap: numpy/soundfile are only pulled in when audio is touched, and
+# librosa only when a resample is actually needed.
+from wavcore.timer import print_timer, reset_timer
+from wavcore import metrics
+from wavcore.audio import info, blocks, load, conform, roundtrip, write
+from wavcore.cache import load_asset, load_json
+
+__all__ = [ 'print_timer', 'reset_timer', 'metrics', 'info', 'blocks', 'load',
+            'conform', 'roundtrip', 'write', 'load_asset', 'load_json' ]
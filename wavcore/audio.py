@@ -0,0 +1,74 @@
+# Audio input helpers built on soundfile. Layouts match librosa so the tools
+# can swap librosa.load for load() without touching their math: a mono
+# signal is (n,) and a multi-channel one is (channels, n).
+import os
+
+from wavcore import metrics
+
+def info(path):
+    # Header only, no sample data is decoded
+    import soundfile as sf
+    return sf.info(path)
+
+def blocks(path, blocksize, overlap=0, start=0, stop=None, dtype='float32'):
+    # Yield (frames, channels) blocks straight from soundfile so callers
+    # can process long inputs without holding them in memory
+    import soundfile as sf
+    return sf.blocks(path, blocksize=blocksize, overlap=overlap, start=start,
+                     stop=stop, dtype=dtype, always_2d=True)
+
+def load(path, sr=None, mono=True, dtype='float32'):
+    # Same contract as librosa.load, but librosa is only imported when the
+    # native rate differs from sr or soundfile can't decode the file
+    import soundfile as sf
+    # Open the file ourselves so a missing or unreadable path raises OSError
+    # here, leaving only format errors to fall back to librosa
+    with open(path, 'rb') as fh:
+        try:
+            with metrics.span('decode'), sf.SoundFile(fh) as f:
+                sr_native = f.samplerate
+                y = f.read(dtype=dtype, always_2d=False).T
+        except RuntimeError:
+            y = None
+    if y is None:
+        import librosa
+        with metrics.span('decode'):
+            y, sr = librosa.load(path, sr=sr, mono=mono, dtype=dtype)
+        metrics.count('bytes_read', os.path.getsize(path))
+        metrics.count('samples_read', y.size)
+        return y, sr
+
+    metrics.count('bytes_read', os.path.getsize(path))
+    metrics.count('samples_read', y.size)
+    return conform(y, sr_native, sr=sr, mono=mono)
+
+def conform(y, sr_native, sr=None, mono=True):
+    # The downmix/resample half of load(), for audio already in memory
+    if mono and y.ndim > 1:
+        y = y.mean(axis=0, dtype=y.dtype)
+    if sr is not None and sr != sr_native:
+        import librosa
+        with metrics.span('resample'):
+            y = librosa.resample(y, orig_sr=sr_native, target_sr=sr)
+    else:
+        sr = sr_native
+    return y, sr
+
+def write(path, y, sr, subtype=None):
+    # sf.write for a librosa-layout signal, counted as the encode stage
+    import soundfile as sf
+    with metrics.span('encode'):
+        sf.write(path, y.T, sr, subtype=subtype)
+    metrics.count('bytes_written', os.path.getsize(path))
+    metrics.count('samples_written', y.size)
+
+def roundtrip(y, sr, subtype=None, dtype='float32'):
+    # Encode to an in-memory WAV and decode it again, giving exactly the
+    # samples a later tool would read back from a file written by sf.write
+    import io
+    import soundfile as sf
+    buf = io.BytesIO()
+    sf.write(buf, y.T, sr, format='WAV', subtype=subtype)
+    buf.seek(0)
+    y, _ = sf.read(buf, dtype=dtype, always_2d=False)
+    return y.T
@@ -0,0 +1,89 @@
+import numpy as np
+
+from wavcore import metrics
+
+BARS = 40
+HEIGHT = 100
+WIDTH = 500
+STEP = 1
+MAX = 0.9
+COLOR = (0,0,0)
+JSONINTERVAL = 10
+JSONMAX = 255
+
+def _sections(y, count):
+    # np.array_split for an array, or the same split read slice by slice
+    # from a WavMap so only one section is decoded at a time
+    if isinstance(y, np.ndarray):
+        yield from np.array_split(y, count)
+        return
+    count = int(count)
+    each, extras = divmod(len(y), count)
+    start = 0
+    for i in range(count):
+        stop = start + each + (1 if i < extras else 0)
+        yield y.mono(start, stop)
+        start = stop
+
+@metrics.timed('rms')
+def rms_json(y, sr, interval=JSONINTERVAL, jsonmax=JSONMAX):
+    # RMS for every interval ms of audio, scaled to integers up to jsonmax
+    jsondata = {}
+    jsondata['interval'] = interval
+    jsondata['data'] = []
+    samples = _sections(y, len(y)/sr*1000/interval)
+    for sample in samples:
+        jsondata['data'].append(np.sqrt(np.mean(sample**2)))
+    # Normalize these values
+    scale = max(jsondata['data'])
+    jsondata['data'] = [ (int(x / scale * jsonmax)) for x in jsondata['data'] ]
+    return jsondata
+
+@metrics.timed('rms')
+def rms_bars(y, bars=BARS, factor=0, top=MAX):
+    # Split into chunks and compute a value for each segment
+    segments = _sections(y, bars)
+    vals = []
+    for s in segments:
+        vals.append(np.sqrt(np.mean(s**2)))
+    # Normalize these values
+    factor = max(vals) if factor == 0 else factor
+    vals = [ (x / factor) * top for x in vals ]
+    return vals, factor
+
+@metrics.timed('draw')
+def draw_bars(outfile, vals, bars=BARS, step=STEP, width=WIDTH, height=HEIGHT,
+              color=COLOR, invert=False, mirror=False, pngfile=None):
+    import cairo
+    from cairo import OPERATOR_CLEAR
+    # Normalized step size per bar
+    bar_step = (width/height) / bars
+    # The scaling factor on bars controls the whitespace gaps
+    line_width = (width/height) / (bars * 1.25)
+
+    with cairo.SVGSurface(outfile, width, height) as surface:
+        context = cairo.Context(surface)
+        context.scale(height, height)
+        context.set_source_rgb(color[0], color[1], color[2])
+        if invert:
+            context.set_source_rgba(color[0], color[1], color[2], 1)
+            context.rectangle(0, 0, height, width)
+            context.fill()
+            context.set_operator(OPERATOR_CLEAR)
+        context.set_line_width(line_width)
+        context.set_line_cap(cairo.LINE_CAP_ROUND)
+        count = 0
+        while count < bars:
+            offset = (bar_step / 2) + (count * bar_step)
+            if mirror:
+                bottom = 1-(1-vals[count])/2
+                top = (1-vals[count])/2
+            else:
+                bottom = 1
+                top = 1-vals[count]
+            context.move_to(offset, bottom)
+            context.line_to(offset, top)
+            context.stroke()
+            count += step
+        if pngfile is not None:
+            surface.write_to_png(pngfile)
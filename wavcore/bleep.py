@@ -0,0 +1,114 @@
+import io
+
+import numpy as np
+
+from wavcore import metrics, wavmap
+
+BLEEP_TYPES = [ 'fuzz', 'beep', 'silence', 'reverse' ]
+FREQUENCY = 12000
+
+def get_fuzz_filler(length, data):
+    return np.random.rand(length ,2)
+
+def get_silence_filler(length, data):
+    return np.zeros((length ,2))
+
+def get_beep_filler(length, data):
+    base = np.linspace(0, 1, length, endpoint=False)
+    beep_data = np.sin(2 * np.pi * FREQUENCY * base)
+    return np.array([beep_data, beep_data]).T
+
+def get_reverse_filler(length, data):
+    return np.flip(data, axis=0)
+
+def get_filler_for_bleep(bleep):
+    if bleep == "beep":
+        return get_beep_filler
+    elif bleep == "reverse":
+        return get_reverse_filler
+    elif bleep == "silence":
+        return get_silence_filler
+    else:
+        return get_fuzz_filler
+
+def build_cutlist(lyrics, wordlist):
+    # Pick out every timed word in the lyrics that is on the wordlist
+    cutlist = []
+    for seg in lyrics['segments']:
+        for word in seg['words']:
+            for version in [ 'text', 'word' ]:
+                try:
+                    if word[version].strip().lower() in wordlist or (word[version] != '[*]' and '*' in word[version]):
+                        if word['start'] != word['end']:
+                            cutlist.append((word[version].strip().lower(), word['start'], word['end']))
+                except:
+                    pass
+    return cutlist
+
+def _cut_range(c1, c2, sr, buffer, length):
+    # Frames covered by a cut plus buffer percent either side
+    gap = c2-c1
+    pad = gap * (buffer / 100)
+    cut1 = int((c1-pad) * sr)
+    cut2 = int((c2+pad) * sr)
+    cut1 = cut1 if cut1 > 0 else 0
+    cut2 = cut2 if cut2 < length else length
+    return cut1, cut2
+
+@metrics.timed('bleep')
+def apply_cutlist(y, sr, cutlist, bleep, buffer, strength):
+    # Replace each cut with filler scaled to the RMS of what it covers
+    get_filler = get_filler_for_bleep(bleep)
+    data = y.T
+    for word, c1, c2 in cutlist:
+        cut1, cut2 = _cut_range(c1, c2, sr, buffer, len(data))
+        fill = get_filler(cut2-cut1, data[cut1:cut2])
+        scale = np.sqrt(np.mean(data[cut1:cut2]**2))
+        fill = fill * scale * strength
+        data = np.concatenate((data[:cut1], fill, data[cut2:]))
+        print(f" - Bleeped \"{word}\" from {c1} - {c2}")
+    return data.T
+
+@metrics.timed('bleep')
+def apply_cutlist_mapped(wm, output, cutlist, bleep, buffer, strength):
+    # Same as apply_cutlist() followed by a 16-bit WAV write, for a mapped
+    # 16-bit input: only the cut ranges are decoded and everything between
+    # them is copied byte for byte. Returns False (writing nothing) when the
+    # input or the cuts don't allow that, so the caller can fall back.
+    import soundfile as sf
+    if wm.subtype != 'PCM_16' or wm.channels != 2:
+        return False
+    cuts = [ _cut_range(c1, c2, wm.samplerate, buffer, wm.frames) for word, c1, c2 in cutlist ]
+    # Overlapping cuts would read audio an earlier cut already replaced
+    ordered = sorted(cut for cut in cuts if cut[1] > cut[0])
+    if any(b[0] < a[1] for a, b in zip(ordered, ordered[1:])):
+        return False
+
+    get_filler = get_filler_for_bleep(bleep)
+    fills = {}
+    # apply_cutlist() works on float32 until a filler promotes it, and the
+    # dtype changes the RMS rounding, so follow it along
+    dtype = np.float32
+    for (word, c1, c2), (cut1, cut2) in zip(cutlist, cuts):
+        data = wm.read(cut1, cut2).astype(dtype)
+        fill = get_filler(cut2-cut1, data)
+        scale = np.sqrt(np.mean(data**2))
+        fill = fill * scale * strength
+        dtype = np.result_type(dtype, fill.dtype)
+        if cut2 > cut1:
+            # Let libsndfile do the conversion so the bytes match sf.write
+            raw = io.BytesIO()
+            sf.write(raw, fill, wm.samplerate, format='RAW', subtype='PCM_16', endian='LITTLE')
+            fills[(cut1, cut2)] = raw.getvalue()
+        print(f" - Bleeped \"{word}\" from {c1} - {c2}")
+
+    # Only the sample data comes from the input; the header is written fresh
+    # so it matches what sf.write would produce
+    parts, pos = [], wm.byte_offset(0)
+    for cut1, cut2 in ordered:
+        parts.append(wm.bytes(pos, wm.byte_offset(cut1)))
+        parts.append(fills[(cut1, cut2)])
+        pos = wm.byte_offset(cut2)
+    parts.append(wm.bytes(pos, wm.byte_offset(wm.frames)))
+    wavmap.write_wav(output, wavmap.pcm16_fmt(wm.channels, wm.samplerate), parts)
+    return True
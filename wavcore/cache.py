@@ -0,0 +1,42 @@
+import json
+import os
+from collections import OrderedDict
+
+from wavcore import metrics
+from wavcore.audio import load
+
+# Shared assets (stamps, wordlists) keyed by path and load arguments. In a
+# one-shot CLI run this is just a dict lookup; in a long-running worker it
+# keeps them decoded between jobs, so it holds at most ENTRIES of them, drops
+# the least recently used first, and replaces an entry whose file has
+# changed rather than keeping both. Callers must not modify what they get
+# back.
+ENTRIES = 32
+_cache = OrderedDict()
+
+def _cached(path, extra, loader):
+    path = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime_ns
+    key = (path,) + extra
+    hit = _cache.get(key)
+    if hit is None or hit[0] != mtime:
+        _cache[key] = (mtime, loader(path))
+        while len(_cache) > ENTRIES:
+            _cache.popitem(last=False)
+    _cache.move_to_end(key)
+    return _cache[key][1]
+
+def load_asset(path, sr=None, mono=True, dtype='float32'):
+    def loader(path):
+        with metrics.prefixed('asset'):
+            return load(path, sr=sr, mono=mono, dtype=dtype)
+    return _cached(path, ('audio', sr, mono, dtype), loader)
+
+def load_json(path):
+    def loader(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return _cached(path, ('json',), loader)
+
+def clear():
+    _cache.clear()
@@ -0,0 +1,29 @@
+# Plain edits shared by wav-mixer, trim-chopper and the pipeline
+from wavcore import metrics
+
+@metrics.timed('mix')
+def mix(tracks):
+    # Accumulators for mixing, starting with first track
+    y_out = tracks[0]
+    for y in tracks[1:]:
+        y_out = y_out + y
+    return y_out
+
+def segment_bounds(frames, sr, trim, size, limit=0):
+    # Frame ranges of each size-second segment after dropping trim seconds
+    # from both ends, stopping after limit segments (0 means all of them)
+    trim = int(trim*sr) if trim != 0 else 0
+    length = frames - 2*trim
+    size = length / sr if size == 0 else size
+    s_count = int(length / (size*sr)) if length > 0 else 0
+    s_count = limit if limit > 0 and s_count > limit else s_count
+    counter = 0
+    while counter < s_count:
+        yield trim + int(counter*size*sr), trim + int((counter+1)*size*sr)
+        counter += 1
+
+def trim(y, sr, trim, size=0, index=0):
+    # One segment of an in-memory (channels, n) or (n,) signal
+    bounds = list(segment_bounds(y.shape[-1], sr, trim, size, index+1))
+    start, stop = bounds[index]
+    return y[..., start:stop]
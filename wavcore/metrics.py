@@ -0,0 +1,190 @@
+# Structured counterpart to print_timer(). Named spans collect wall and CPU
+# time per stage, counters collect bytes and samples, and finish() emits one
+# record per run as a JSON line or a Prometheus textfile. --profile adds
+# cProfile and tracemalloc around the whole run.
+#
+# Spans nest, and each stage is charged only its own (exclusive) time: a
+# decode or encode inside another span counts towards decode or encode, not
+# both, so the stages add up to no more than the run.
+import os
+import sys
+import json
+import time
+import atexit
+import functools
+import resource
+import contextlib
+
+_state = {}
+_registered = []
+
+def _process_peak_rss_kb():
+    # High-water mark for the whole process, so in a long-lived worker it
+    # covers every job it has run, not just this one
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def _rss_kb():
+    # Current resident set size, or None where /proc isn't available
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') // 1024
+
+def reset(tool=None, output=None, profile=None):
+    _state.clear()
+    _state['tool'] = tool or os.path.splitext(os.path.basename(sys.argv[0]))[0]
+    _state['output'] = output
+    _state['profile'] = profile
+    _state['wall'] = time.perf_counter()
+    _state['cpu'] = time.process_time()
+    _state['stages'] = {}
+    _state['counters'] = {}
+    _state['profiler'] = None
+    _state['stack'] = []
+    _state['prefix'] = ''
+
+def add_arguments(parser):
+    parser.add_argument("--metrics", required=False, help = "append run metrics to file (JSON Lines, or Prometheus text if it ends in .prom)")
+    parser.add_argument("--profile", required=False, help = "write cProfile stats to file and report tracemalloc peaks")
+
+def start(args, tool=None):
+    # Call right after parse_args(); finish() runs at exit if not called
+    reset(tool, args.metrics, args.profile)
+    if args.profile is not None:
+        import cProfile
+        import tracemalloc
+        tracemalloc.start()
+        _state['profiler'] = cProfile.Profile()
+        _state['profiler'].enable()
+    if not _registered:
+        atexit.register(finish)
+        _registered.append(True)
+
+@contextlib.contextmanager
+def span(name):
+    if not _state:
+        reset()
+    name = _state['prefix'] + name
+    # What nested spans used, to take back out of this one
+    children = { 'wall': 0.0, 'cpu': 0.0, 'rss': 0 }
+    _state['stack'].append(children)
+    wall, cpu, rss = time.perf_counter(), time.process_time(), _rss_kb()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+        end = _rss_kb()
+        _state['stack'].pop()
+        stage = _state['stages'].setdefault(name, { 'calls': 0, 'wall': 0.0, 'cpu': 0.0 })
+        stage['calls'] += 1
+        stage['wall'] += wall - children['wall']
+        stage['cpu'] += cpu - children['cpu']
+        # Net RSS growth over the span; memory freed before it ends or
+        # reused from an earlier stage doesn't show up here
+        delta = end - rss if rss is not None and end is not None else None
+        if delta is not None:
+            stage['rss_delta_kb'] = stage.get('rss_delta_kb', 0) + delta - children['rss']
+        if _state['stack']:
+            parent = _state['stack'][-1]
+            parent['wall'] += wall
+            parent['cpu'] += cpu
+            parent['rss'] += delta or 0
+
+@contextlib.contextmanager
+def prefixed(prefix):
+    # Spans and counters inside get prefix_ in front of their names, so work
+    # on shared assets (stamps) stays apart from the tool's own input
+    if not _state:
+        reset()
+    saved = _state['prefix']
+    _state['prefix'] = saved + prefix + '_'
+    try:
+        yield
+    finally:
+        _state['prefix'] = saved
+
+def timed(name):
+    # Decorator form of span() for the shared operations
+    def wrap(func):
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return inner
+    return wrap
+
+def count(name, n):
+    if not _state:
+        reset()
+    name = _state['prefix'] + name
+    _state['counters'][name] = _state['counters'].get(name, 0) + int(n)
+
+def record():
+    return { 'tool': _state['tool'],
+             'time': time.time(),
+             'wall': time.perf_counter() - _state['wall'],
+             'cpu': time.process_time() - _state['cpu'],
+             'process_peak_rss_kb': _process_peak_rss_kb(),
+             'counters': dict(_state['counters']),
+             'stages': { k: dict(v) for k, v in _state['stages'].items() } }
+
+def _prometheus(rec):
+    # Samples of one metric have to be grouped under a single TYPE line
+    tool = rec['tool']
+    metrics = {}
+    def metric(name, kind, value, **labels):
+        labels = dict(tool=tool, **labels)
+        text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+        metrics.setdefault(name, (kind, []))[1].append(f"wavtool_{name}{{{text}}} {value}")
+    metric("run_wall_seconds", "gauge", rec['wall'])
+    metric("run_cpu_seconds", "gauge", rec['cpu'])
+    metric("process_peak_rss_bytes", "gauge", rec['process_peak_rss_kb'] * 1024)
+    for name, value in rec['counters'].items():
+        metric(f"{name}_total", "counter", value)
+    for name, stage in rec['stages'].items():
+        metric("stage_wall_seconds", "gauge", stage['wall'], stage=name)
+        metric("stage_cpu_seconds", "gauge", stage['cpu'], stage=name)
+        metric("stage_calls", "gauge", stage['calls'], stage=name)
+        if 'rss_delta_kb' in stage:
+            metric("stage_rss_delta_bytes", "gauge", stage['rss_delta_kb'] * 1024, stage=name)
+    lines = []
+    for name, (kind, samples) in metrics.items():
+        lines.append(f"# TYPE wavtool_{name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+def _report_profile(profiler):
+    import io
+    import pstats
+    import tracemalloc
+    profiler.disable()
+    profiler.dump_stats(_state['profile'])
+    current, peak = tracemalloc.get_traced_memory()
+    top = tracemalloc.take_snapshot().statistics('lineno')[:10]
+    tracemalloc.stop()
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(15)
+    print(text.getvalue())
+    print(f"tracemalloc: current {current/1024/1024:.1f} MiB, peak {peak/1024/1024:.1f} MiB")
+    for stat in top:
+        print(f"  {stat}")
+
+def finish():
+    # Emit once per run; returns the record so callers can pass it on
+    if not _state or _state.get('finished'):
+        return None
+    _state['finished'] = True
+    if _state['profiler'] is not None:
+        _report_profile(_state['profiler'])
+    rec = record()
+    if _state['output'] is not None:
+        if _state['output'].endswith('.prom'):
+            with open(_state['output'], 'w') as f:
+                f.write(_prometheus(rec))
+        else:
+            with open(_state['output'], 'a') as f:
+                f.write(json.dumps(rec) + "\n")
+    return rec
@@ -0,0 +1,16 @@
+import time
+
+# Timer helper function
+time_start = time.perf_counter()
+time_last = 0
+
+def print_timer():
+    global time_start, time_last
+    now = time.perf_counter()
+    print("[%05.2f][%05.2f]" % (now-time_start, now-time_last), end=" ")
+    time_last = now
+
+def reset_timer():
+    global time_start, time_last
+    time_start = time.perf_counter()
+    time_last = time_start
@@ -0,0 +1,65 @@
+import numpy as np
+
+from wavcore import metrics
+from wavcore.timer import print_timer
+from wavcore.cache import load_asset
+
+SAMPLE_RATE = 44100
+SILENCE_DELAY = 5
+SILENCE_GAP = 5
+
+@metrics.timed('watermark')
+def generate_watermark(target_shape, stamp, sr=SAMPLE_RATE, delay=SILENCE_DELAY, gap=SILENCE_GAP):
+    # Build either a stereo or a mono watermark track based on input type
+    if len(target_shape) == 2:
+        print_timer()
+        print(" - Generating STEREO watermark...")
+        return _generate_stereo_watermark(target_shape, stamp, sr, delay, gap)
+    else:
+        print_timer()
+        print(" - Generating MONO watermark...")
+        return _generate_mono_watermark(target_shape, stamp, sr, delay, gap)
+
+def _generate_mono_watermark(target_shape, stamp, sr, delay, gap):
+    y_stamp, sr = load_asset(stamp, sr=sr, mono=True)
+    silence_gap = np.zeros(sr*gap, dtype=np.float32)
+
+    # Start with delay seconds of silence and then build
+    watermark = np.zeros(sr*delay, dtype=np.float32)
+    while watermark.shape[0] < target_shape[0]:
+        watermark = np.concatenate((watermark, y_stamp))
+        watermark = np.concatenate((watermark, silence_gap))
+    # Trim the watermark to the same size as requested
+    watermark = watermark[:target_shape[0]]
+    return watermark
+
+def _generate_stereo_watermark(target_shape, stamp, sr, delay, gap):
+    # Load the stamp as mono and build a silence track of the same length
+    y_stamp, sr = load_asset(stamp, sr=sr, mono=True)
+    y_stamp_silent = np.zeros(y_stamp.shape)
+    # Make a number of versions with different stereo placement
+    versions = []
+    farleft = np.array([y_stamp, y_stamp_silent], dtype=np.float32)
+    midleft = np.array([y_stamp*0.8, y_stamp*0.2], dtype=np.float32)
+    nearleft = np.array([y_stamp*0.6, y_stamp*0.4], dtype=np.float32)
+    farright = np.array([y_stamp_silent, y_stamp], dtype=np.float32)
+    midright = np.array([y_stamp*0.2, y_stamp*0.8], dtype=np.float32)
+    nearright = np.array([y_stamp*0.4, y_stamp*0.6], dtype=np.float32)
+    center = np.array([y_stamp*0.5, y_stamp*0.5], dtype=np.float32)
+    versions = [ farleft, midleft, nearleft, center, nearright, midright, farright ]
+    silence_gap = np.zeros((2,sr*gap), dtype=np.float32)
+
+    # Start with delay seconds of silence and then build
+    watermark = np.zeros((2,sr*delay), dtype=np.float32)
+    while watermark.shape[1] < target_shape[1]:
+        this_stamp = versions[int(np.random.random() * len(versions))]
+        watermark = np.concatenate((watermark.T, this_stamp.T)).T
+        watermark = np.concatenate((watermark.T, silence_gap.T)).T
+    # Trim the watermark to the same size as requested
+    watermark = watermark.T[:target_shape[1]].T
+    return watermark
+
+@metrics.timed('mix')
+def apply_watermark(y, watermark, strength):
+    # Mix the watermark into the audio
+    return y + (watermark * strength)
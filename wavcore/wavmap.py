@@ -0,0 +1,159 @@
+# Memory-mapped access to plain PCM/float WAV files. The RIFF data chunk is
+# exposed as a NumPy view over the mapping, so reading a range of frames only
+# faults in the pages behind it, and untouched ranges can be copied straight
+# from the mapping into an output file without decoding.
+import os
+import mmap
+import struct
+
+from wavcore import metrics
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# (format tag, bits) -> (soundfile subtype, sample dtype, float scale)
+FORMATS = {
+    (WAVE_FORMAT_PCM, 16): ('PCM_16', '<i2', 1 / 0x8000),
+    (WAVE_FORMAT_PCM, 24): ('PCM_24', 'u1', 1 / 0x800000),
+    (WAVE_FORMAT_PCM, 32): ('PCM_32', '<i4', 1 / 0x80000000),
+    (WAVE_FORMAT_IEEE_FLOAT, 32): ('FLOAT', '<f4', 1.0),
+}
+
+class WavMap:
+    def __init__(self, path):
+        # numpy is only needed once there's a file to map, not for --help
+        import numpy as np
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except Exception:
+            self._mm.close()
+            raise
+        dtype = np.dtype(self._dtype)
+        shape = (self.frames, self.channels, 3) if self.subtype == 'PCM_24' else (self.frames, self.channels)
+        self.raw = np.frombuffer(self._mm, dtype=dtype, count=int(np.prod(shape)),
+                                 offset=self.data_offset).reshape(shape)
+
+    def _parse(self):
+        mm = self._mm
+        if len(mm) < 12 or mm[0:4] != b'RIFF' or mm[8:12] != b'WAVE':
+            raise ValueError("not a RIFF/WAVE file")
+        pos, fmt = 12, None
+        while pos + 8 <= len(mm):
+            chunk, size = mm[pos:pos+4], struct.unpack('<I', mm[pos+4:pos+8])[0]
+            if chunk == b'fmt ':
+                fmt = bytes(mm[pos+8:pos+8+size])
+            elif chunk == b'data':
+                if fmt is None:
+                    raise ValueError("data chunk before fmt chunk")
+                self.data_offset = pos + 8
+                # Streamed writers can leave the size unset, trust the file
+                self.data_size = min(size, len(mm) - self.data_offset)
+                break
+            pos += 8 + size + (size & 1)
+        else:
+            raise ValueError("no data chunk")
+        tag, self.channels, self.samplerate = struct.unpack('<HHI', fmt[0:8])
+        block_align, self.bits = struct.unpack('<HH', fmt[12:16])
+        if tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            tag = struct.unpack('<H', fmt[24:26])[0]
+        if (tag, self.bits) not in FORMATS or block_align != self.channels * self.bits // 8:
+            raise ValueError(f"unsupported WAV format {tag:#x}/{self.bits}-bit")
+        self.fmt_chunk = fmt
+        self.subtype, self._dtype, self._scale = FORMATS[(tag, self.bits)]
+        self.frame_bytes = block_align
+        self.frames = self.data_size // block_align
+
+    def __len__(self):
+        return self.frames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        # Views must go before the mapping can be closed
+        self.raw = None
+        self._mm.close()
+
+    def read(self, start=0, stop=None, dtype='float32'):
+        # (frames, channels) floats scaled the way libsndfile reads them
+        import numpy as np
+        raw = self.raw[start:stop]
+        metrics.count('bytes_read', raw.nbytes)
+        if self.subtype == 'PCM_24':
+            raw = raw.astype(np.int32)
+            raw = (raw[..., 0] | (raw[..., 1] << 8) | (raw[..., 2] << 16)) << 8 >> 8
+        metrics.count('samples_read', raw.size)
+        if self.subtype == 'FLOAT':
+            return raw.astype(dtype)
+        return (raw.astype(np.float64) * self._scale).astype(dtype)
+
+    def mono(self, start=0, stop=None, dtype='float32'):
+        # Same downmix as wavcore.load(mono=True)
+        y = self.read(start, stop, dtype)
+        return y.mean(axis=1, dtype=y.dtype) if self.channels > 1 else y[:, 0]
+
+    def byte_offset(self, frame):
+        return self.data_offset + frame * self.frame_bytes
+
+    def bytes(self, start=0, stop=None):
+        # Zero-copy view of a byte range of the file
+        stop = len(self._mm) if stop is None else stop
+        return memoryview(self._mm)[start:stop]
+
+    def write_frames(self, path, start, stop):
+        # A new WAV holding frames [start, stop) copied without decoding
+        write_wav(path, self.fmt_chunk, [ self.bytes(self.byte_offset(start), self.byte_offset(stop)) ])
+
+def pcm16_fmt(channels, samplerate):
+    # The fmt chunk libsndfile writes for 16-bit PCM
+    return struct.pack('<HHIIHH', WAVE_FORMAT_PCM, channels, samplerate,
+                       samplerate * channels * 2, channels * 2, 16)
+
+def write_wav(path, fmt_chunk, parts):
+    # Write a WAV with a fresh RIFF/fmt/data header around the byte ranges in
+    # parts. It goes to a temporary file that replaces path at the end, so
+    # path may be the file the parts are mapped from. Mapped parts count as
+    # read, like the rest of a file wavcore.load would have decoded.
+    size = sum(len(part) for part in parts)
+    copied = sum(len(part) for part in parts if isinstance(part, memoryview))
+    sample_bytes = struct.unpack('<H', fmt_chunk[14:16])[0] // 8
+    pad = size & 1
+    fmt_pad = len(fmt_chunk) & 1
+    riff = 4 + 8 + len(fmt_chunk) + fmt_pad + 8 + size + pad
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with metrics.span('copy'), open(tmp, 'wb') as f:
+            f.write(b'RIFF' + struct.pack('<I', riff) + b'WAVE')
+            f.write(b'fmt ' + struct.pack('<I', len(fmt_chunk)) + fmt_chunk + b'\0' * fmt_pad)
+            f.write(b'data' + struct.pack('<I', size))
+            for part in parts:
+                f.write(part)
+            f.write(b'\0' * pad)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    finally:
+        for part in parts:
+            if isinstance(part, memoryview):
+                part.release()
+    metrics.count('bytes_read', copied)
+    metrics.count('samples_read', copied // sample_bytes)
+    metrics.count('bytes_written', os.path.getsize(path))
+    metrics.count('samples_written', size // sample_bytes)
+
+def open_map(path):
+    # A WavMap if the file is a plain PCM/float WAV, otherwise None so the
+    # caller can fall back to wavcore.load
+    try:
+        return WavMap(path)
+    except (OSError, ValueError, struct.error):
+        return None
@@ -7,7 +7,8 @@ import json
 import zipfile
 import subprocess
 import argparse
-import time
+import wavcore
+from wavcore import print_timer
 
 TMPDIR = '/tmp'
 FFPROBE_BIN = '/usr/local/bin/ffprobe'
@@ -19,15 +20,6 @@ FFPROBE_EXTS = [ ".wav",
                  ".png",
                  ".gif", ]
 
-# Timer helper function
-time_start = time.perf_counter()
-time_last = 0
-def print_timer():
-    global time_start, time_last
-    now = time.perf_counter()
-    print("[%05.2f][%05.2f]" % (now-time_start, now-time_last), end=" ")
-    time_last = now
-
 def _get_media_info(wavfile):
     # Build the command line to run
     cmdline = []
@@ -92,7 +84,9 @@ def main():
     parser.add_argument("-i", "--input", required=True, help = "input zip file to be inventoried")
     parser.add_argument("-o", "--output", required=True, help = "write JSON formatted output to file")
     parser.add_argument("-f", "--ffprobe", required=False, help = "path to ffprobe binary to use")
+    wavcore.metrics.add_arguments(parser)
     args = parser.parse_args()
+    wavcore.metrics.start(args)
 
     # Get the zip filename and a scratch directory
     file = args.input
@@ -105,14 +99,16 @@ def main():
     print_timer()
     print("Extracting zip file...")
     # Extract the zip archive
-    with zipfile.ZipFile(file, "r") as z:
+    with wavcore.metrics.span('extract'), zipfile.ZipFile(file, "r") as z:
         z.extractall(scratch)
+    wavcore.metrics.count('bytes_read', os.path.getsize(file))
 
     print_timer()
     print("Checking files...")
     # Recursively inventory what we found
     extracted = os.path.abspath(scratch)
-    zipinfo, others = _check_dir(extracted, extracted)
+    with wavcore.metrics.span('probe'):
+        zipinfo, others = _check_dir(extracted, extracted)
 
     print_timer()
     print("Summarizing metadata...")
@@ -140,6 +136,7 @@ def main():
     print("Writing output...")
     with open(outfile, 'w') as f:
         f.write(json.dumps(inventory, indent=2))
+    wavcore.metrics.count('bytes_written', os.path.getsize(outfile))
     shutil.rmtree(scratch)
 
     print_timer()